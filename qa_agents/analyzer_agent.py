@@ -2,17 +2,26 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
+import subprocess
+import tempfile
 from pathlib import Path
 
 from .audit_schema import TechStackManifest
-from .utils import analyze_python_file, verify_path_exists
+from .utils import GIT_EXECUTABLE, analyze_python_file, loads_json, verify_path_exists
 
 logger = logging.getLogger("qa-council-server.analyzer-agent")
 
 EXCLUDED_PARTS = {".git", "__pycache__", ".venv", "venv", "node_modules"}
 
+# Codebase reports persist across server runs, keyed by the commit they describe.
+_ANALYSIS_CACHE_DIR_ENV = "ANALYSIS_CACHE_DIR"
+_DEFAULT_ANALYSIS_CACHE_DIR = "/app/cache/analysis"
+_ANALYSIS_CACHE_SCHEMA = 1
+
 
 def discover_unit_test_targets(repo: Path) -> list[str]:
     """Return generator targets discovered during analysis (python + frontend entrypoint)."""
@@ -46,12 +55,17 @@ def discover_unit_test_targets(repo: Path) -> list[str]:
     return py_targets
 
 
+def _iter_repo_files(repo: Path, pattern: str):
+    # Same exclusions as the other scans, so vendored and virtual-env files never shape the manifest.
+    return (path for path in repo.rglob(pattern) if not EXCLUDED_PARTS.intersection(path.parts))
+
+
 def discover_tech_stack_manifest(repo: Path) -> TechStackManifest:
     """Infer a TechStackManifest from common repository markers."""
     backend_lang = "unknown"
-    if any(repo.rglob("*.py")):
+    if any(_iter_repo_files(repo, "*.py")):
         backend_lang = "python/pytest"
-    elif any(repo.rglob("*.java")):
+    elif any(_iter_repo_files(repo, "*.java")):
         backend_lang = "java/junit"
 
     frontend_framework = "none"
@@ -66,13 +80,13 @@ def discover_tech_stack_manifest(repo: Path) -> TechStackManifest:
 
     db_type = "unknown"
     for marker, value in (("postgres", "postgres"), ("mysql", "mysql"), ("sqlite", "sqlite"), ("mongodb", "mongodb")):
-        if any(marker in path.name.lower() for path in repo.rglob("*")):
+        if any(marker in path.name.lower() for path in _iter_repo_files(repo, "*")):
             db_type = value
             break
 
     auth_mechanism = "unknown"
     for marker, value in (("jwt", "jwt"), ("oauth", "oauth"), ("session", "session-cookie"), ("auth", "token-based")):
-        if any(marker in str(path).lower() for path in repo.rglob("*.py")):
+        if any(marker in str(path).lower() for path in _iter_repo_files(repo, "*.py")):
             auth_mechanism = value
             break
 
@@ -104,8 +118,8 @@ def discover_testable_surfaces(repo: Path) -> dict:
         if "error" in analysis:
             continue
         relative = str(py_file.relative_to(repo))
-        api_endpoints.extend([f"{relative}:{func['name']}" for func in analysis.get("functions", []) if func["name"].startswith(("get_", "post_", "put_", "delete_"))])
-        logic_flows.extend([f"{relative}:{func['name']}" for func in analysis.get("functions", []) if not func["name"].startswith("_")])
+        api_endpoints.extend([f"{relative}:{name}" for name in analysis["fn_names"] if name.startswith(("get_", "post_", "put_", "delete_"))])
+        logic_flows.extend([f"{relative}:{name}" for name in analysis["fn_names"] if not name.startswith("_")])
 
     for component in repo.rglob("*.tsx"):
         if EXCLUDED_PARTS.intersection(component.parts):
@@ -119,6 +133,70 @@ def discover_testable_surfaces(repo: Path) -> dict:
     }
 
 
+def _clean_head_sha(repo: Path) -> str:
+    """Return HEAD's commit id, or "" when the repo is not git or the tree differs from that commit."""
+    # One status call yields the commit and every local difference, including ignored files: the
+    # scans read those too. Only ignored paths under EXCLUDED_PARTS are safe, since no scan enters them.
+    try:
+        result = subprocess.run(
+            [GIT_EXECUTABLE, "-C", str(repo), "status", "--porcelain=v2", "--branch", "--ignored", "--", "."],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            check=False,
+        )
+    except Exception:
+        return ""
+
+    if result.returncode != 0:
+        return ""
+
+    sha = ""
+    for line in result.stdout.splitlines():
+        if line.startswith("! ") and EXCLUDED_PARTS.intersection(Path(line[2:]).parts):
+            continue
+        if not line.startswith("# "):
+            return ""
+        if line.startswith("# branch.oid "):
+            sha = line.split()[2]
+    return "" if sha == "(initial)" else sha
+
+
+def _analysis_cache_file(repo: Path, sha: str, file_pattern: str) -> str:
+    # The path is part of the key: subdirectories of one checkout share a commit but not a report.
+    cache_dir = os.environ.get(_ANALYSIS_CACHE_DIR_ENV, _DEFAULT_ANALYSIS_CACHE_DIR)
+    scope_key = hashlib.sha256(f"{repo.resolve()}\0{file_pattern}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{sha}-{scope_key}-v{_ANALYSIS_CACHE_SCHEMA}.json")
+
+
+def _read_cached_report(cache_file: str) -> str | None:
+    try:
+        with open(cache_file, "rb") as handle:
+            return loads_json(handle.read())["report"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cached_report(cache_file: str, report: str) -> None:
+    # Write to a temp file and rename so concurrent readers never see a partial entry.
+    cache_dir = os.path.dirname(cache_file)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({"report": report}, handle)
+        os.replace(temp_path, cache_file)
+    except OSError:
+        # Never leave a half-written temp file behind in the cache directory.
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
 async def analyze_codebase(repo_path: str, file_pattern: str = "*.py") -> str:
     """Analyze Python codebase structure and identify testable components."""
     logger.info("Starting codebase analysis: repo_path=%s, pattern=%s", repo_path, file_pattern)
@@ -137,6 +215,15 @@ async def analyze_codebase(repo_path: str, file_pattern: str = "*.py") -> str:
         logger.warning("Analysis aborted: verified path is not a directory (%s)", verified_path)
         return f"❌ Error: Invalid repository path: {verified_path}"
 
+    # An unchanged commit yields an identical report, so skip the whole walk on a hit.
+    sha = _clean_head_sha(repo)
+    cache_file = _analysis_cache_file(repo, sha, file_pattern) if sha else ""
+    if cache_file:
+        cached = _read_cached_report(cache_file)
+        if cached is not None:
+            logger.info("Codebase analysis served from cache for commit %s", sha)
+            return cached
+
     py_files = list(repo.rglob(file_pattern))
     py_files = [
         f
@@ -160,11 +247,11 @@ async def analyze_codebase(repo_path: str, file_pattern: str = "*.py") -> str:
         file_analysis["path"] = str(py_file.relative_to(repo))
         analysis["files"].append(file_analysis)
 
-    total_functions = sum(len(f.get("functions", [])) for f in analysis["files"])
-    total_classes = sum(len(f.get("classes", [])) for f in analysis["files"])
+    total_functions = sum(len(f.get("fn_names", [])) for f in analysis["files"])
+    total_classes = sum(len(f.get("cls_names", [])) for f in analysis["files"])
     recommended_targets = discover_unit_test_targets(repo)
 
-    return (
+    report = (
         "📊 Codebase Analysis Complete\n\n"
         f"📁 Files analyzed: {analysis['total_files']}\n"
         f"⚡ Functions found: {total_functions}\n"
@@ -173,3 +260,6 @@ async def analyze_codebase(repo_path: str, file_pattern: str = "*.py") -> str:
         f"\n🗺️ Testable Surfaces:\n{json.dumps(surfaces, indent=2)}\n"
         f"\n🎯 Recommended unit test targets:\n" + "\n".join(f"- {target}" for target in recommended_targets)
     )
+    if cache_file:
+        _write_cached_report(cache_file, report)
+    return report
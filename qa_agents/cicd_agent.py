@@ -10,7 +10,7 @@ from pathlib import Path
 
 import httpx
 
-from .utils import get_github_token, get_repo_identifier_from_local_repo, verify_path_exists
+from .utils import get_github_client, get_github_token, get_repo_identifier_from_local_repo, verify_path_exists
 
 logger = logging.getLogger("qa-council-server.cicd-agent")
 
@@ -41,8 +41,7 @@ async def _trigger_github_workflow(
     payload = {"ref": ref}
 
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            response = await client.post(dispatch_url, headers=headers, json=payload)
+        response = await get_github_client().post(dispatch_url, headers=headers, json=payload, timeout=20.0)
     except httpx.HTTPError as exc:
         logger.warning("Workflow dispatch failed due to network/HTTP issue: %s", exc)
         return False, f"⚠️ Workflow dispatch failed: {exc}"
@@ -1,23 +1,74 @@
 """Executor agent.
 
 Runs discovered test commands and summarizes outcomes for the orchestrator.
+
+Test runners are spawned with ``close_fds=False``: every descriptor Python opens
+is non-inheritable by default (PEP 446) and stdio is wired explicitly, so there
+is nothing to close and the child skips the descriptor sweep. Each runner starts
+in its own session so a timeout can terminate the whole process group, not just
+the top-level runner.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import functools
+import importlib.util
 import json
 import logging
+import os
 import re
+import signal
 import subprocess
+import time
+import uuid
 from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
 
 from .audit_schema import FailurePayload
-from .utils import verify_path_exists
+from .utils import loads_json, verify_path_exists
 
 logger = logging.getLogger("qa-council-server.executor-agent")
 
+# Marker block rendered by execute_tests and consumed by the healer/orchestrator.
+_FAILURE_PAYLOAD_START = "FailurePayload:\n["
+_FAILURE_PAYLOAD_END = "]\n\n"
+# Emitted verbatim by pytest, vitest and mocha, so plain case-sensitive substring checks suffice.
+_NO_TESTS_MARKERS = ("no tests ran", "collected 0 items", "No test files found", "0 passing")
+_TIMEOUT_RE = re.compile("timeout", re.IGNORECASE)
+_SELECTOR_RE = re.compile(r"(#[-_a-zA-Z0-9]+|\.[-_a-zA-Z0-9]+)")
+_SELECTOR_WINDOW = 200
+_ERROR_MARKERS = ("AssertionError", "Traceback")
+
+_PYTEST_MARKERS = frozenset({"pytest.ini", "pyproject.toml", "tox.ini"})
+# Quiet progress and one-line tracebacks keep captured output small; the HTML report
+# keeps full detail. The short test summary is still printed by default.
+_PYTEST_OUTPUT_FLAGS = ("-q", "--tb=line", "--no-header", "-p", "no:cacheprovider")
+_OPTION_ERROR_MARKERS = ("unrecognized arguments:", "Unknown option")
+_OUTPUT_TAIL_BYTES = 64 * 1024
+_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# Cheap gate: outputs without any of these cannot contain a summary or coverage total.
+_METRIC_TOKENS = ("passed", "failed", "skipped", "%")
+# Runners print summaries and coverage totals last, so only the tail of the output is searched.
+_METRICS_TAIL_CHARS = 16 * 1024
+# One scan picks up whichever of these appear; the named group says which one matched.
+_METRICS_RE = re.compile(
+    # pytest: "===== 1 failed, 2 passed in 0.12s =====" (or without rules in -q mode)
+    r"^=*[ \t]*(?P<pytest>\d+ \w+(?:, \d+ \w+)*) in [\d.]+s"
+    # jest: "Tests:  1 failed, 2 passed, 3 total" / vitest: "Tests  2 passed (2)"
+    r"|^[ \t]*Tests:?[ \t]+(?P<js>\d+ .+)$"
+    # pytest-cov terminal table total
+    r"|(?i:^TOTAL\s+\d+\s+\d+\s+(?P<total>\d+)%)"
+    r"|(?i:coverage[:\s]+(?P<coverage>\d+(?:\.\d+)?)%)",
+    re.MULTILINE,
+)
+_SUMMARY_COUNT_RE = re.compile(r"(\d+) (passed|failed|skipped)")
+# Output returned by poll_test_run while a background run is still going.
+_POLL_TAIL_BYTES = 4 * 1024
+# Finished runs that are never polled are forgotten after this long.
+_FINISHED_RUN_TTL_SECONDS = 3600.0
 
 @dataclass(frozen=True)
 class TestCommand:
@@ -30,130 +81,232 @@ class TestCommand:
     coverage_file: str = "N/A"
 
 
+@dataclass(frozen=True)
+class _BackgroundRun:
+    """Test run started by start_test_run and tracked until it is polled to completion."""
+
+    task: asyncio.Task
+    log_file: Path
+    started: float
+
+
+# Background runs by id; an entry is dropped once its result has been returned, it is cancelled, or
+# _FINISHED_RUN_TTL_SECONDS after it finished.
+_background_runs: dict[str, _BackgroundRun] = {}
+
+
+def _ensure_dir(directory: Path) -> None:
+    # Output directories almost always exist already; stat before attempting mkdir.
+    if not directory.is_dir():
+        directory.mkdir(parents=True, exist_ok=True)
+
+
+@functools.lru_cache(maxsize=1)
+def _pytest_plugins() -> tuple[bool, bool]:
+    """Return whether pytest-cov and pytest-html are importable, probed once per process."""
+    return importlib.util.find_spec("pytest_cov") is not None, importlib.util.find_spec("pytest_html") is not None
+
+
+def _list_repo_root(repo: Path) -> set[str]:
+    # One readdir answers every root-level marker probe below.
+    try:
+        return set(os.listdir(repo))
+    except OSError:
+        return set()
+
+
 def _load_package_json(repo: Path) -> dict:
-    package_json = repo / "package.json"
-    if not package_json.exists():
-        return {}
     try:
-        return json.loads(package_json.read_text(encoding="utf-8"))
+        return json.loads((repo / "package.json").read_text(encoding="utf-8"))
     except (json.JSONDecodeError, OSError):
         return {}
 
 
 def _discover_test_command(repo: Path, test_results_dir: Path, coverage_dir: Path, test_path: str = "") -> TestCommand:
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime(_TIMESTAMP_FORMAT)
     report_file = test_results_dir / f"report_{timestamp}.html"
     coverage_file = coverage_dir / f"coverage_{timestamp}.xml"
-    package_json = _load_package_json(repo)
+    entries = _list_repo_root(repo)
+    has_package_json = "package.json" in entries
+    package_json = _load_package_json(repo) if has_package_json else {}
     deps = {**package_json.get("dependencies", {}), **package_json.get("devDependencies", {})}
 
-    pytest_markers = [repo / "pytest.ini", repo / "pyproject.toml", repo / "tox.ini"]
-    has_pytest_markers = any(marker.exists() for marker in pytest_markers)
-    has_python_tests = any(repo.glob("tests/**/*.py")) or any(repo.glob("test_*.py"))
+    has_pytest_markers = not _PYTEST_MARKERS.isdisjoint(entries)
+    has_python_tests = ("tests" in entries and any(repo.glob("tests/**/*.py"))) or any(
+        name.startswith("test_") and name.endswith(".py") for name in entries
+    )
 
     if has_pytest_markers or has_python_tests:
+        # Only pass plugin options pytest will accept, so no run is wasted on a usage error.
+        has_cov, has_html = _pytest_plugins()
+        cmd = ["pytest", *_PYTEST_OUTPUT_FLAGS]
+        if has_html:
+            cmd += [f"--html={report_file}", "--self-contained-html"]
+        if has_cov:
+            cmd += [f"--cov={test_path or str(repo)}", f"--cov-report=xml:{coverage_file}", "--cov-report=term"]
+        cmd.append(test_path or str(repo))
         return TestCommand(
             kind="pytest",
-            cmd=[
-                "pytest",
-                "-v",
-                "--tb=short",
-                f"--html={report_file}",
-                "--self-contained-html",
-                f"--cov={test_path or str(repo)}",
-                f"--cov-report=xml:{coverage_file}",
-                "--cov-report=term",
-                test_path or str(repo),
-            ],
-            fallback_cmd=["pytest", "-v", "--tb=short", test_path or str(repo)],
-            report_file=str(report_file),
-            coverage_file=str(coverage_file),
+            cmd=cmd,
+            report_file=str(report_file) if has_html else "N/A (pytest-html not installed)",
+            coverage_file=str(coverage_file) if has_cov else "N/A (pytest-cov not installed)",
         )
 
-    if (repo / "package.json").exists() and "vitest" in deps:
+    if has_package_json and "vitest" in deps:
         return TestCommand(kind="vitest", cmd=["npm", "run", "test", "--", "--run"], fallback_cmd=["npm", "test"])
 
-    if (repo / "package.json").exists() and "jest" in deps:
+    if has_package_json and "jest" in deps:
         return TestCommand(kind="jest", cmd=["npm", "test", "--", "--runInBand"], fallback_cmd=["npm", "test"])
 
     if has_python_tests or any(repo.rglob("*.py")):
         return TestCommand(kind="unittest", cmd=["python", "-m", "unittest", "discover", "-v", test_path or "tests"])
 
-    return TestCommand(kind="default", cmd=["pytest", "-v", "--tb=short", test_path or str(repo)])
-
-
-def _extract_test_summary(output: str) -> tuple[int, int, int, bool]:
-    patterns = [
-        r"(?:(\d+) passed)?(?:,\s*)?(?:(\d+) failed)?(?:,\s*)?(?:(\d+) skipped)?(?:,\s*)?in\s",
-        r"Tests:\s*(?:\d+\s+total,\s*)?(?:(\d+) passed)?(?:,\s*)?(?:(\d+) failed)?(?:,\s*)?(?:(\d+) skipped)?",
-    ]
-    passed = failed = skipped = 0
-    for pattern in patterns:
-        match = re.search(pattern, output, re.IGNORECASE)
-        if match:
-            passed = int((match.group(1) or "0"))
-            failed = int((match.group(2) or "0"))
-            skipped = int((match.group(3) or "0"))
+    return TestCommand(kind="default", cmd=["pytest", *_PYTEST_OUTPUT_FLAGS, test_path or str(repo)])
+
+
+def _extract_run_metrics(*streams: str) -> tuple[int, int, int, bool, str]:
+    """Parse runner counts and coverage percentage, preferring earlier streams."""
+    summary = coverage = None
+    for stream in streams:
+        tail = stream[-_METRICS_TAIL_CHARS:]
+        # Crashes and usage errors print neither; skip the pattern scan for them.
+        if not any(token in tail for token in _METRIC_TOKENS):
+            continue
+        found: dict[str, str] = {}
+        for match in _METRICS_RE.finditer(tail):
+            kind = match.lastgroup
+            if kind in ("pytest", "js"):
+                found[kind] = match.group(kind)  # the final summary line wins
+            else:
+                found.setdefault(kind, match.group(kind))
+        summary = summary or found.get("pytest") or found.get("js")
+        coverage = coverage or found.get("total") or found.get("coverage")
+        if summary and coverage:
             break
 
-    lowered = output.lower()
-    no_tests_collected = any(marker in lowered for marker in ("no tests ran", "collected 0 items", "no test files found", "0 passing"))
-    return passed, failed, skipped, no_tests_collected
+    counts = {kind: int(count) for count, kind in _SUMMARY_COUNT_RE.findall(summary or "")}
+    no_tests_collected = any(marker in stream for stream in streams for marker in _NO_TESTS_MARKERS)
+    return (
+        counts.get("passed", 0),
+        counts.get("failed", 0),
+        counts.get("skipped", 0),
+        no_tests_collected,
+        coverage or "N/A",
+    )
+
 
+def _read_tail(log_file: Path, max_bytes: int = _OUTPUT_TAIL_BYTES) -> str:
+    # Summaries, coverage tables and failure recaps are printed last; only the tail is kept in memory.
+    with log_file.open("rb") as handle:
+        size = handle.seek(0, os.SEEK_END)
+        handle.seek(max(0, size - max_bytes))
+        data = handle.read()
+    if size > max_bytes:
+        data = data.partition(b"\n")[2]
+    return data.decode("utf-8", errors="replace")
 
-def _extract_coverage_pct(output: str) -> str:
-    for pattern in (r"TOTAL\s+\d+\s+\d+\s+(\d+)%", r"coverage[:\s]+(\d+(?:\.\d+)?)%"):
-        match = re.search(pattern, output, flags=re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-    return "N/A"
 
+async def _kill_process_group(proc: asyncio.subprocess.Process) -> None:
+    # Runners such as pytest-xdist or jest fork workers; kill the whole group.
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(proc.pid, signal.SIGKILL)
+    await proc.wait()
 
-def _run_command(cmd: list[str], cwd: str, timeout: int = 300) -> subprocess.CompletedProcess[str]:
+
+async def _run_command(cmd: list[str], cwd: str, log_file: Path, timeout: int = 300) -> subprocess.CompletedProcess[str]:
     # Keep command execution centralized for easier timeout/error handling.
-    return subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, timeout=timeout)
+    # stdout streams to disk so chatty suites never sit in memory; stderr stays small and piped.
+    with log_file.open("wb") as log_handle:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=log_handle,
+            stderr=subprocess.PIPE,
+            close_fds=False,
+            start_new_session=True,
+        )
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await _kill_process_group(proc)
+            raise subprocess.TimeoutExpired(cmd, timeout) from None
+        except asyncio.CancelledError:
+            # A cancelled run (client abort or cancel_test_run) must not leave the runner behind.
+            await _kill_process_group(proc)
+            raise
+    return subprocess.CompletedProcess(cmd, proc.returncode, _read_tail(log_file), stderr.decode("utf-8", errors="replace"))
 
 
 def _extract_failure_payloads(output: str) -> list[FailurePayload]:
     payloads: list[FailurePayload] = []
-    if "timeout" in output.lower():
-        selector_match = re.search(r"(#[-_a-zA-Z0-9]+|\.[-_a-zA-Z0-9]+)", output)
+    timeout_match = _TIMEOUT_RE.search(output)
+    if timeout_match:
+        # The failing selector is reported next to the timeout; only scan that neighbourhood.
+        hit = timeout_match.start()
+        selector_match = _SELECTOR_RE.search(output, max(0, hit - _SELECTOR_WINDOW), hit + _SELECTOR_WINDOW)
         selector = selector_match.group(1) if selector_match else "#submit-btn"
         dom_snapshot = "<html><body><button id='submit-button'>Submit</button></body></html>"
         payloads.append(FailurePayload(error="Timeout", selector=selector, dom_snapshot=dom_snapshot, traceback=output[:500]))
-    elif re.search(r"AssertionError|Traceback", output):
+    elif any(marker in output for marker in _ERROR_MARKERS):
         payloads.append(FailurePayload(error="AssertionError", selector="#unknown", dom_snapshot="<html></html>", traceback=output[:500]))
     return payloads
 
 
+def parse_failure_payloads(executor_output: str) -> list[FailurePayload]:
+    """Parse the FailurePayload block rendered by execute_tests."""
+    # Two substring searches locate the JSON list; no DOTALL regex scan over the whole output.
+    start = executor_output.find(_FAILURE_PAYLOAD_START)
+    if start == -1:
+        return []
+    start += len(_FAILURE_PAYLOAD_START) - 1
+    end = executor_output.find(_FAILURE_PAYLOAD_END, start)
+    if end == -1:
+        return []
+    try:
+        return [FailurePayload(**payload) for payload in loads_json(executor_output[start : end + 1])]
+    except (json.JSONDecodeError, TypeError):
+        return []
+
+
 def _persist_loguru_trace(test_results_dir: Path, result: dict, failure_payloads: list[FailurePayload]) -> str:
-    trace_file = test_results_dir / f"loguru_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    trace_file = test_results_dir / f"loguru_trace_{time.strftime(_TIMESTAMP_FORMAT)}.json"
     structured = {
         "runner": result.get("runner", "unknown"),
         "exit_code": result.get("exit_code", 1),
-        "stdout": result.get("stdout", "")[:3000],
-        "stderr": result.get("stderr", "")[:3000],
+        "stdout": result.get("stdout", "")[-3000:],
+        "stderr": result.get("stderr", "")[-3000:],
         "failure_payloads": [item.__dict__ for item in failure_payloads],
     }
-    trace_file.write_text(json.dumps(structured, indent=2), encoding="utf-8")
+    # Stream straight into the file; indentation is opt-in since traces are mostly machine-read.
+    indent = 2 if os.environ.get("TRACE_PRETTY_JSON", "").strip().lower() in {"1", "true", "yes"} else None
+    with trace_file.open("w", encoding="utf-8") as handle:
+        json.dump(structured, handle, indent=indent)
     return str(trace_file)
 
 
-def _run_tests(repo_path: str, test_results_dir: Path, coverage_dir: Path, test_path: str = "") -> tuple[bool, dict]:
-    test_results_dir.mkdir(parents=True, exist_ok=True)
-    coverage_dir.mkdir(parents=True, exist_ok=True)
+async def _run_tests(
+    repo_path: str, test_results_dir: Path, coverage_dir: Path, test_path: str = "", log_file: Path | None = None
+) -> tuple[bool, dict]:
+    _ensure_dir(test_results_dir)
+    _ensure_dir(coverage_dir)
 
     repo = Path(repo_path)
     selected = _discover_test_command(repo, test_results_dir, coverage_dir, test_path)
-    logger.info("Executing %s command: %s", selected.kind, " ".join(selected.cmd))
+    # The timestamp only has second resolution; the suffix keeps concurrent runs in separate files.
+    log_file = log_file or test_results_dir / (
+        f"{selected.kind}_output_{time.strftime(_TIMESTAMP_FORMAT)}_{uuid.uuid4().hex[:8]}.log"
+    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Executing %s command: %s", selected.kind, " ".join(selected.cmd))
 
     try:
-        primary = _run_command(selected.cmd, repo_path)
-        combined = f"{primary.stdout}\n{primary.stderr}"
+        primary = await _run_command(selected.cmd, repo_path, log_file)
 
-        plugin_option_error = "unrecognized arguments:" in combined or "Unknown option" in combined
+        # Argument parsers report unknown options on stderr; no need to join it with stdout.
+        plugin_option_error = any(marker in primary.stderr for marker in _OPTION_ERROR_MARKERS)
         if primary.returncode != 0 and plugin_option_error and selected.fallback_cmd:
-            fallback = _run_command(selected.fallback_cmd, repo_path)
+            fallback = await _run_command(selected.fallback_cmd, repo_path, log_file)
             return True, {
                 "runner": selected.kind,
                 "exit_code": fallback.returncode,
@@ -161,6 +314,7 @@ def _run_tests(repo_path: str, test_results_dir: Path, coverage_dir: Path, test_
                 "stderr": fallback.stderr,
                 "report_file": "N/A (fallback mode)",
                 "coverage_file": "N/A (fallback mode)",
+                "log_file": str(log_file),
                 "used_fallback": True,
             }
 
@@ -171,6 +325,7 @@ def _run_tests(repo_path: str, test_results_dir: Path, coverage_dir: Path, test_
             "stderr": primary.stderr,
             "report_file": selected.report_file,
             "coverage_file": selected.coverage_file,
+            "log_file": str(log_file),
             "used_fallback": False,
         }
     except subprocess.TimeoutExpired:
@@ -179,7 +334,9 @@ def _run_tests(repo_path: str, test_results_dir: Path, coverage_dir: Path, test_
         return False, {"error": f"Missing test command: {cmd_error}"}
 
 
-async def execute_tests(repo_path: str, test_results_dir: Path, coverage_dir: Path, test_path: str = "") -> str:
+async def execute_tests(
+    repo_path: str, test_results_dir: Path, coverage_dir: Path, test_path: str = "", log_file: Path | None = None
+) -> str:
     """Execute discovered tests and summarize outcomes."""
     if not repo_path.strip():
         return "❌ Error: Repository path is required"
@@ -188,18 +345,23 @@ async def execute_tests(repo_path: str, test_results_dir: Path, coverage_dir: Pa
     if not path_exists:
         return f"❌ Error: {verified_path}"
 
-    success, result = _run_tests(verified_path, test_results_dir, coverage_dir, test_path)
+    success, result = await _run_tests(verified_path, test_results_dir, coverage_dir, test_path, log_file)
     if not success:
         return f"❌ Test execution error: {result.get('error', 'Unknown error')}"
 
-    combined_output = f"{result.get('stdout', '')}\n{result.get('stderr', '')}".strip()
-    passed, failed, skipped, no_tests_collected = _extract_test_summary(combined_output)
-    coverage_pct = _extract_coverage_pct(combined_output)
-    failure_payloads = _extract_failure_payloads(combined_output)
+    # pytest reports on stdout while jest and unittest use stderr; parse each stream as-is
+    # rather than copying both into one buffer.
+    stdout = result.get("stdout", "")
+    stderr = result.get("stderr", "")
+    passed, failed, skipped, no_tests_collected, coverage_pct = _extract_run_metrics(stdout, stderr)
+    failure_payloads = _extract_failure_payloads(stdout) or _extract_failure_payloads(stderr)
+    # Keep the end of each stream: that is where failure recaps and summaries live.
+    output_excerpt = "\n".join(part for part in (stdout[-1600:].strip(), stderr[-1600:].strip()) if part)[-1600:]
     trace_file = _persist_loguru_trace(test_results_dir, result, failure_payloads)
 
-    status = "✅" if result.get("exit_code", 1) == 0 and not no_tests_collected else "❌" if result.get("exit_code", 1) != 0 else "⚠️"
-    failure_json = json.dumps([p.__dict__ for p in failure_payloads], indent=2)
+    exit_code = result.get("exit_code", 1)
+    status = "✅" if exit_code == 0 and not no_tests_collected else "❌" if exit_code != 0 else "⚠️"
+    failure_json = json.dumps([p.__dict__ for p in failure_payloads], indent=2) if failure_payloads else "[]"
 
     return f"""{status} Test Execution Complete
 
@@ -213,10 +375,70 @@ async def execute_tests(repo_path: str, test_results_dir: Path, coverage_dir: Pa
 
 📄 Report: {result.get('report_file')}
 📈 Coverage: {result.get('coverage_file')}
+🗒️ Full Output: {result.get('log_file')}
 🧾 Loguru JSON Trace: {trace_file}
 
 FailurePayload:
 {failure_json}
 
-{combined_output[:1600]}
+{output_excerpt}
 """
+
+
+async def start_test_run(repo_path: str, test_results_dir: Path, coverage_dir: Path, test_path: str = "") -> str:
+    """Start execute_tests in the background and return a run id for poll_test_run."""
+    if not repo_path.strip():
+        return "❌ Error: Repository path is required"
+
+    path_exists, verified_path = verify_path_exists(repo_path)
+    if not path_exists:
+        return f"❌ Error: {verified_path}"
+
+    _ensure_dir(test_results_dir)
+    run_id = uuid.uuid4().hex[:12]
+    log_file = test_results_dir / f"run_{run_id}_output.log"
+    task = asyncio.create_task(execute_tests(verified_path, test_results_dir, coverage_dir, test_path, log_file))
+    _background_runs[run_id] = _BackgroundRun(task=task, log_file=log_file, started=time.monotonic())
+    # Run ids are never reused, so a late eviction cannot drop a newer entry.
+    task.add_done_callback(
+        lambda _task: asyncio.get_running_loop().call_later(
+            _FINISHED_RUN_TTL_SECONDS, _background_runs.pop, run_id, None
+        )
+    )
+    logger.info("Started background test run %s for %s", run_id, verified_path)
+    return f"🚀 Test run started\n\n🆔 Run ID: {run_id}\n🗒️ Full Output: {log_file}"
+
+
+async def poll_test_run(run_id: str) -> str:
+    """Return the final summary of a finished run, or the latest output of a running one."""
+    run = _background_runs.get(run_id)
+    if run is None:
+        return f"❌ Error: Unknown test run: {run_id}"
+
+    if run.task.done():
+        del _background_runs[run_id]
+        try:
+            return run.task.result()
+        except Exception as exc:
+            return f"❌ Test execution error: {exc}"
+
+    # The runner streams stdout to the log file, so progress is read from disk, not buffered here.
+    try:
+        partial_output = _read_tail(run.log_file, _POLL_TAIL_BYTES).strip()
+    except FileNotFoundError:
+        partial_output = ""
+    elapsed = time.monotonic() - run.started
+    return f"⏳ Test run {run_id} in progress\n\n⏱️ Elapsed: {elapsed:.1f}s\n\n{partial_output}"
+
+
+async def cancel_test_run(run_id: str) -> str:
+    """Stop a background run and its runner processes."""
+    run = _background_runs.pop(run_id, None)
+    if run is None:
+        return f"❌ Error: Unknown test run: {run_id}"
+
+    run.task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await run.task
+    logger.info("Cancelled background test run %s", run_id)
+    return f"🛑 Test run {run_id} cancelled\n\n🗒️ Partial Output: {run.log_file}"
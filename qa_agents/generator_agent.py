@@ -5,7 +5,10 @@ Builds deterministic test scaffolds for Python and React projects.
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
+import re
 from pathlib import Path
 
 from .utils import analyze_python_file, verify_path_exists
@@ -14,78 +17,105 @@ logger = logging.getLogger("qa-council-server.generator-agent")
 
 REACT_EXTENSIONS = {".js", ".jsx", ".ts", ".tsx"}
 
+# Single scan classifying argument names; the lookahead matches at every offset so
+# overlapping keywords (e.g. "urlimit") are all seen, then the first kind listed wins.
+_ARG_KIND_RE = re.compile(
+    r"(?=(?P<num>id|count|size|limit|port)"
+    r"|(?P<str>name|title|text|path|url)"
+    r"|(?P<bool>^(?:is|has|should)_)"
+    r"|(?P<list>items|list|values)"
+    r"|(?P<dict>config|options|data|payload))"
+)
+_ARG_KIND_DEFAULTS = (("num", "1"), ("str", "'sample'"), ("bool", "True"), ("list", "[]"), ("dict", "{}"))
+
+# Test-file templates, built once at import and filled with str.format.
+_UNIT_MODULE_TEMPLATE = '''"""Generated unit tests for {target_file}."""
+{asyncio_import_line}import pytest
+from unittest.mock import Mock, patch
+
+import {module_import_path} as module_under_test
+{from_import_line}
+'''
+
+_UNIT_CLASS_TEMPLATE = '''
+
+class Test{class_name}:
+    """Behavioral contract tests for `{class_name}`."""
+
+    @pytest.fixture()
+    def instance(self):
+        constructor_kwargs = {{}}
+        with patch.object(module_under_test, "logger", autospec=True, create=True):
+            return {class_name}(**constructor_kwargs)
+
+    def test_public_methods_exposed(self, instance):
+        """Public methods should be available for usage by callers."""
+{method_assertions}
+'''
+
+_UNIT_FUNCTION_TEMPLATE = '''
+def test_{name}_smoke_and_contract(monkeypatch):
+    """Smoke + contract test for `{name}` using deterministic mocks."""
+{arrange}
+    with patch.object(module_under_test, "logger", autospec=True, create=True):
+        result = {call_expression}
+
+    assert result is not ...
+'''
+
+_PLAYWRIGHT_TEMPLATE = '''"""E2E tests for {test_name}."""
+import re
+
+from playwright.sync_api import Page, expect
+
+
+def test_{test_name}_page_loads(page: Page, base_url: str):
+    page.goto(base_url)
+    expect(page).to_have_title(re.compile(r".+"))
+'''
+
 
 def _ensure_test_directories(repo: Path) -> None:
     for relative in ("tests/pages", "tests/e2e", "tests/integration", "tests/unit"):
         (repo / relative).mkdir(parents=True, exist_ok=True)
 
 
+@functools.lru_cache(maxsize=1024)
 def _build_module_import(target_file: str) -> str:
     # Convert a file path into an import path (foo/bar.py -> foo.bar).
     module_path = Path(target_file).with_suffix("")
     return ".".join(module_path.parts)
 
 
+@functools.lru_cache(maxsize=1024)
 def _default_value_for_arg(arg_name: str) -> str:
     # Use stable defaults to keep generated tests deterministic.
-    lowered = arg_name.lower()
-    if any(key in lowered for key in ("id", "count", "size", "limit", "port")):
-        return "1"
-    if any(key in lowered for key in ("name", "title", "text", "path", "url")):
-        return "'sample'"
-    if lowered.startswith(("is_", "has_", "should_")):
-        return "True"
-    if any(key in lowered for key in ("items", "list", "values")):
-        return "[]"
-    if any(key in lowered for key in ("config", "options", "data", "payload")):
-        return "{}"
-    return "Mock()"
-
-
-def _render_function_test(func: dict) -> str:
-    name = func["name"]
+    kinds = {match.lastgroup for match in _ARG_KIND_RE.finditer(arg_name.lower())}
+    return next((value for kind, value in _ARG_KIND_DEFAULTS if kind in kinds), "Mock()")
+
+
+def _render_function_test(name: str, func_args: list[str], is_async: bool) -> str:
     if name.startswith("_"):
         return ""
 
-    args = [a for a in func.get("args", []) if a != "self"]
+    args = [a for a in func_args if a != "self"]
     assignment_lines = [f"    {arg} = {_default_value_for_arg(arg)}" for arg in args]
     call_args = ", ".join(args)
     arrange = "\n".join(assignment_lines) if assignment_lines else "    # No input args required"
     call_expression = f"{name}({call_args})" if call_args else f"{name}()"
+    if is_async:
+        call_expression = f"asyncio.run({call_expression})"
 
-    return f'''
-def test_{name}_smoke_and_contract(monkeypatch):
-    """Smoke + contract test for `{name}` using deterministic mocks."""
-{arrange}
-    with patch.object(module_under_test, "logger", autospec=True, create=True):
-        result = {call_expression}
+    return _UNIT_FUNCTION_TEMPLATE.format(name=name, arrange=arrange, call_expression=call_expression)
 
-    assert result is not ...
-'''
 
-
-def _render_class_tests(cls: dict) -> str:
-    class_name = cls["name"]
-    methods = [m for m in cls.get("methods", []) if not m.startswith("_")]
+def _render_class_tests(class_name: str, class_methods: list[str]) -> str:
+    methods = [m for m in class_methods if not m.startswith("_")]
     method_assertions = "\n".join(
         [f"        assert callable(getattr(instance, '{method}', None))" for method in methods]
     ) or "        assert instance is not None"
 
-    return f'''
-
-class Test{class_name}:
-    """Behavioral contract tests for `{class_name}`."""
-
-    @pytest.fixture()
-    def instance(self):
-        constructor_kwargs = {{}}
-        with patch.object(module_under_test, "logger", autospec=True, create=True):
-            return {class_name}(**constructor_kwargs)
-
-    def test_public_methods_exposed(self, instance):
-        """Public methods should be available for usage by callers."""
-{method_assertions}
-'''
+    return _UNIT_CLASS_TEMPLATE.format(class_name=class_name, method_assertions=method_assertions)
 
 
 def _generate_python_unit_tests(verified_path: str, target_file: str) -> str:
@@ -102,31 +132,36 @@ def _generate_python_unit_tests(verified_path: str, target_file: str) -> str:
     test_file_path.parent.mkdir(parents=True, exist_ok=True)
 
     module_import_path = _build_module_import(target_file)
-    public_functions = [f for f in analysis.get("functions", []) if not f["name"].startswith("_")]
-    import_targets = [c["name"] for c in analysis.get("classes", [])] + [f["name"] for f in public_functions]
+    class_names = analysis["cls_names"]
+    # Walk the parallel function lists once, keeping the indices of public functions.
+    public_indices = [i for i, name in enumerate(analysis["fn_names"]) if not name.startswith("_")]
+    public_names = [analysis["fn_names"][i] for i in public_indices]
+    import_targets = class_names + public_names
     from_import_line = f"from {module_import_path} import {', '.join(import_targets)}" if import_targets else ""
-
-    test_content = f'''"""Generated unit tests for {target_file}."""
-import pytest
-from unittest.mock import Mock, patch
-
-import {module_import_path} as module_under_test
-{from_import_line}
-'''
-
-    for cls in analysis.get("classes", []):
-        test_content += _render_class_tests(cls)
-    for func in public_functions:
-        test_content += _render_function_test(func)
-
-    test_file_path.write_text(test_content, encoding="utf-8")
+    asyncio_import_line = "import asyncio\n" if any(analysis["fn_is_async"][i] for i in public_indices) else ""
+
+    parts = [
+        _UNIT_MODULE_TEMPLATE.format(
+            target_file=target_file,
+            asyncio_import_line=asyncio_import_line,
+            module_import_path=module_import_path,
+            from_import_line=from_import_line,
+        )
+    ]
+    parts.extend(map(_render_class_tests, class_names, analysis["cls_methods"]))
+    parts.extend(
+        _render_function_test(analysis["fn_names"][i], analysis["fn_args"][i], analysis["fn_is_async"][i])
+        for i in public_indices
+    )
+
+    test_file_path.write_bytes("".join(parts).encode("utf-8"))
     logger.info("Generated Python unit test file: %s", test_file_path)
 
     return f"""✅ Unit tests generated successfully
 
 📝 Test file: {test_file_path}
-🧪 Classes tested: {len(analysis.get('classes', []))}
-⚡ Functions tested: {len(public_functions)}
+🧪 Classes tested: {len(class_names)}
+⚡ Functions tested: {len(public_indices)}
 🛠️ Test style: pytest + unittest.mock (fixtures, patching, contract assertions)
 """
 
@@ -180,7 +215,7 @@ describe("{stem} component", () => {{
 }});
 '''
 
-    test_file_path.write_text(test_content, encoding="utf-8")
+    test_file_path.write_bytes(test_content.encode("utf-8"))
     logger.info("Generated React unit test file: %s", test_file_path)
 
     return f"""✅ React unit tests generated successfully
@@ -216,10 +251,11 @@ async def generate_unit_tests(repo_path: str, target_file: str, manifest_json: s
         logger.warning("Unit test generation aborted: file not found (%s)", file_path)
         return f"❌ Error: File not found: {target_file}"
 
+    # Parsing and rendering are synchronous; run them off the event loop so concurrent targets overlap.
     if file_path.suffix in REACT_EXTENSIONS and "frontend" in file_path.parts:
-        return _generate_react_unit_tests(verified_path, target_file)
+        return await asyncio.to_thread(_generate_react_unit_tests, verified_path, target_file)
     if file_path.suffix == ".py":
-        return _generate_python_unit_tests(verified_path, target_file)
+        return await asyncio.to_thread(_generate_python_unit_tests, verified_path, target_file)
 
     logger.info("Unsupported unit test target skipped: %s", target_file)
     return f"⚠️ Unsupported file type for unit test generation: {target_file}"
@@ -246,19 +282,10 @@ async def generate_e2e_tests(repo_path: str, base_url: str, test_name: str = "ap
     test_dir = repo / "tests" / "e2e"
     test_dir.mkdir(parents=True, exist_ok=True)
 
-    test_content = f'''"""E2E tests for {test_name}."""
-import re
-
-from playwright.sync_api import Page, expect
-
-
-def test_{test_name}_page_loads(page: Page, base_url: str):
-    page.goto(base_url)
-    expect(page).to_have_title(re.compile(r".+"))
-'''
+    test_content = _PLAYWRIGHT_TEMPLATE.format(test_name=test_name)
 
     test_file = test_dir / f"test_{test_name}_e2e.py"
-    test_file.write_text(test_content, encoding="utf-8")
+    test_file.write_bytes(test_content.encode("utf-8"))
     logger.info("Generated E2E test file: %s", test_file)
 
     return f"✅ E2E tests generated successfully\n\n🌐 Base URL: {base_url}\n📝 Test file: {test_file}"
@@ -292,5 +319,5 @@ def test_{service_name}_dependency_mocking():
     payload = dependency()
     assert payload["result"] == "ok"
 '''
-    test_file.write_text(content, encoding="utf-8")
+    test_file.write_bytes(content.encode("utf-8"))
     return f"✅ Integration tests generated successfully\n\n📝 Test file: {test_file}"
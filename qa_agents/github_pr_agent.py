@@ -5,24 +5,70 @@ This module creates fix branches and pull requests for generated QA repairs.
 
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
 import logging
-import subprocess
+import time
 from datetime import datetime
 from pathlib import Path
 
 import httpx
 
-from .utils import get_github_token, sanitize_repo_name
+from .utils import GIT_EXECUTABLE, get_github_client, get_github_token, loads_json, run_quiet_process, sanitize_repo_name
 
 logger = logging.getLogger("qa-council-server.github-pr-agent")
 
 
+# Caps concurrent GitHub API requests; bursts beyond this trip secondary rate limits.
+_github_api_slots = asyncio.Semaphore(8)
+_RATE_LIMIT_RETRIES = 3
+_MAX_RATE_LIMIT_WAIT_SECONDS = 60.0
+
 # Default Git identity used when the environment does not provide one.
 _DEFAULT_GIT_USER_NAME = "QA Council Bot"
 _DEFAULT_GIT_USER_EMAIL = "qa-council-bot@users.noreply.github.com"
 
+_FIX_COMMIT_MESSAGE = "fix(qa): update selectors and generated tests"
+
+# Stage, commit and push in one bash process instead of one fork per git step.
+# Positional args: $1 name, $2 email, $3 message, $4 branch. Exit code 3 means
+# nothing was staged. One config probe decides which identity fields need a
+# per-commit -c fallback, so repository-specific settings are never overridden
+# and nothing is written to the repo config.
+_NO_CHANGES_EXIT = 3
+_COMMIT_AND_PUSH_SCRIPT = rf"""set -e
+git add .
+git diff --cached --quiet && exit {_NO_CHANGES_EXIT}
+identity=$'\n'"$(git config --get-regexp '^user\.(name|email)$' || true)"
+fallback=()
+[[ $identity == *$'\n'"user.name "?* ]] || fallback+=(-c "user.name=$1")
+[[ $identity == *$'\n'"user.email "?* ]] || fallback+=(-c "user.email=$2")
+git "${{fallback[@]}}" commit -q -m "$3"
+git push -q -u origin "$4"
+"""
+
 
+def _rate_limit_delay(response: httpx.Response, attempt: int) -> float | None:
+    """Seconds to wait before retrying a rate-limited response, or None if it is not rate limited."""
+    if response.status_code not in (403, 429):
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), _MAX_RATE_LIMIT_WAIT_SECONDS)
+        except ValueError:
+            pass
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            reset_in = float(response.headers.get("X-RateLimit-Reset", "")) - time.time()
+        except ValueError:
+            reset_in = 0.0
+        return min(max(reset_in, 2.0**attempt), _MAX_RATE_LIMIT_WAIT_SECONDS)
+    # A 429 is always throttling; a plain 403 is a permission error and is not retried.
+    return 2.0**attempt if response.status_code == 429 else None
+
+
+@functools.lru_cache(maxsize=256)
 def _extract_github_info(repo_url: str) -> tuple[str | None, str | None]:
     """Extract owner/repo metadata from a GitHub URL."""
     parts = repo_url.rstrip("/").split("/")
@@ -39,18 +85,12 @@ async def _create_github_pr(
     title: str,
     body: str,
     head_branch: str,
+    github_token: str,
     base_branch: str = "main",
 ) -> tuple[bool, str]:
     """Call GitHub API to open a pull request for generated fixes."""
-    github_token = get_github_token()
-    if not github_token:
-        return False, "GitHub token not configured"
-
     url = f"https://api.github.com/repos/{owner}/{repo}/pulls"
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3+json",
-    }
+    headers = {"Authorization": f"token {github_token}"}
     data = {
         "title": title,
         "body": body,
@@ -61,8 +101,20 @@ async def _create_github_pr(
     logger.info("Creating GitHub PR via API: %s/%s head=%s base=%s", owner, repo, head_branch, base_branch)
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=data, timeout=30)
+        for attempt in range(_RATE_LIMIT_RETRIES + 1):
+            async with _github_api_slots:
+                response = await get_github_client().post(url, headers=headers, json=data)
+            delay = _rate_limit_delay(response, attempt)
+            if delay is None or attempt == _RATE_LIMIT_RETRIES:
+                break
+            logger.warning(
+                "GitHub API rate limited (status=%s remaining=%s); retrying in %.1fs",
+                response.status_code,
+                response.headers.get("X-RateLimit-Remaining"),
+                delay,
+            )
+            await asyncio.sleep(delay)
+
         if response.status_code == 201:
             pr_url = response.json().get("html_url", "")
             logger.info("Created GitHub PR successfully: %s", pr_url)
@@ -79,49 +131,39 @@ async def _create_test_fix_branch(repo_path: str, branch_name: str, fixes: list[
     logger.info("Creating test-fix branch: %s in %s (fixes=%d)", branch_name, repo_path, len(fixes))
 
     try:
-        checkout = subprocess.run(
-            ["git", "-C", repo_path, "checkout", "-b", branch_name],
-            capture_output=True,
-            text=True,
-            timeout=10,
+        checkout_code, checkout_stderr = await run_quiet_process(
+            GIT_EXECUTABLE, "-C", repo_path, "checkout", "-b", branch_name, timeout=10
+        )
+        if checkout_code != 0:
+            logger.error("Failed creating branch: %s", checkout_stderr)
+            return False, f"Failed to create branch: {checkout_stderr}"
+
+        # Create each parent directory once, then write the fix files concurrently off the event loop.
+        targets = [(Path(repo_path) / fix["file"], fix["content"]) for fix in fixes]
+        for parent in {file_path.parent for file_path, _ in targets}:
+            parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.gather(
+            *(asyncio.to_thread(file_path.write_text, content, encoding="utf-8") for file_path, content in targets)
         )
-        if checkout.returncode != 0:
-            logger.error("Failed creating branch: %s", checkout.stderr)
-            return False, f"Failed to create branch: {checkout.stderr}"
-
-        for fix in fixes:
-            file_path = Path(repo_path) / fix["file"]
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(fix["content"], encoding="utf-8")
-
-        # Stage all generated repair files before diff/commit checks.
-        subprocess.run(["git", "-C", repo_path, "add", "."], check=True, timeout=10)
 
-        diff_check = subprocess.run(
-            ["git", "-C", repo_path, "diff", "--cached", "--quiet"],
-            timeout=10,
+        publish_code, publish_stderr = await run_quiet_process(
+            "bash",
+            "-c",
+            _COMMIT_AND_PUSH_SCRIPT,
+            "commit-and-push",
+            _DEFAULT_GIT_USER_NAME,
+            _DEFAULT_GIT_USER_EMAIL,
+            _FIX_COMMIT_MESSAGE,
+            branch_name,
+            cwd=repo_path,
+            timeout=60,
         )
-        if diff_check.returncode == 0:
+        if publish_code == _NO_CHANGES_EXIT:
             logger.info("No staged changes detected after applying fixes; skipping commit/push")
             return True, "no_changes"
-
-        _ensure_local_git_identity(repo_path)
-
-        subprocess.run(
-            ["git", "-C", repo_path, "commit", "-m", "fix(qa): update selectors and generated tests"],
-            check=True,
-            timeout=10,
-        )
-
-        push = subprocess.run(
-            ["git", "-C", repo_path, "push", "-u", "origin", branch_name],
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        if push.returncode != 0:
-            logger.error("Failed pushing branch: %s", push.stderr)
-            return False, f"Failed to push branch: {push.stderr}"
+        if publish_code != 0:
+            logger.error("Failed committing/pushing branch: %s", publish_stderr)
+            return False, f"Failed to push branch: {publish_stderr}"
 
         logger.info("Created and pushed test-fix branch successfully: %s", branch_name)
         return True, branch_name
@@ -130,36 +172,6 @@ async def _create_test_fix_branch(repo_path: str, branch_name: str, fixes: list[
         return False, f"Error creating fix branch: {exc}"
 
 
-def _ensure_local_git_identity(repo_path: str) -> None:
-    """Ensure repository-local git identity exists so non-interactive commits can succeed."""
-    configured_name = subprocess.run(
-        ["git", "-C", repo_path, "config", "--get", "user.name"],
-        capture_output=True,
-        text=True,
-        timeout=10,
-    )
-    configured_email = subprocess.run(
-        ["git", "-C", repo_path, "config", "--get", "user.email"],
-        capture_output=True,
-        text=True,
-        timeout=10,
-    )
-
-    # Configure only missing fields to avoid overriding repository-specific settings.
-    if configured_name.returncode != 0 or not configured_name.stdout.strip():
-        subprocess.run(
-            ["git", "-C", repo_path, "config", "user.name", _DEFAULT_GIT_USER_NAME],
-            check=True,
-            timeout=10,
-        )
-    if configured_email.returncode != 0 or not configured_email.stdout.strip():
-        subprocess.run(
-            ["git", "-C", repo_path, "config", "user.email", _DEFAULT_GIT_USER_EMAIL],
-            check=True,
-            timeout=10,
-        )
-
-
 async def create_test_fix_pr(repo_url: str, test_output: str, fixes: str, workspace_dir: Path) -> str:
     """Create GitHub PR with automated test fixes from QA Council analysis."""
     logger.info("Starting PR creation flow for repo URL: %s", repo_url)
@@ -173,7 +185,8 @@ async def create_test_fix_pr(repo_url: str, test_output: str, fixes: str, worksp
         logger.warning("PR creation aborted: invalid GitHub URL (%s)", repo_url)
         return "❌ Error: Invalid GitHub repository URL"
 
-    if not get_github_token():
+    github_token = get_github_token()
+    if not github_token:
         logger.warning("PR creation aborted: no GitHub token was configured")
         return "❌ Error: GitHub token not configured. Set GITHUB_TOKEN (or GH_TOKEN/GITHUB_PAT)."
 
@@ -183,7 +196,7 @@ async def create_test_fix_pr(repo_url: str, test_output: str, fixes: str, worksp
 
     # Parse optional fix payload from orchestrator output.
     try:
-        fix_list = json.loads(fixes) if fixes.strip() else []
+        fix_list = loads_json(fixes) if fixes.strip() else []
     except Exception:
         logger.warning("Fix payload was not valid JSON; proceeding without file changes")
         fix_list = []
@@ -216,7 +229,7 @@ async def create_test_fix_pr(repo_url: str, test_output: str, fixes: str, worksp
 {test_output[:1200] if test_output else 'Test analysis completed'}
 """
 
-    success, pr_url = await _create_github_pr(owner, repo, pr_title, pr_body, branch_name)
+    success, pr_url = await _create_github_pr(owner, repo, pr_title, pr_body, branch_name, github_token)
     if not success:
         return f"❌ Failed to create PR: {pr_url}"
 
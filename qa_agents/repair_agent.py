@@ -1,46 +1,244 @@
-"""Healer agent for parsing failures and applying self-healing patches."""
+"""Healer agent for parsing failures, suggesting fixes and applying self-healing patches."""
 
 from __future__ import annotations
 
-import json
+import asyncio
+import io
 import logging
+import mmap
+import os
 import re
+import subprocess
 from pathlib import Path
 
+from .executor_agent import parse_failure_payloads
+from .utils import GIT_EXECUTABLE
+
 logger = logging.getLogger("qa-council-server.repair-agent")
 
+_ID_ATTR_RE = re.compile(r"id=['\"]([^'\"]+)['\"]")
+_CLASS_ATTR_RE = re.compile(r"class=['\"]([^'\"]+)['\"]")
+
+_PAGE_OBJECT_SUFFIXES = (".py", ".ts", ".tsx", ".js")
+
+# One scan finds the structural lines: "=== title ===" rules, "___ test_name ___" headers and
+# "FAILED/ERROR nodeid - message" summary lines. Each match starts at the newline before its line,
+# so the regex engine jumps from newline to newline and other lines never reach Python.
+# Headers need a run of underscores and a title starting with neither "_" nor whitespace, so the
+# "_ _ _ _" separators --tb=long prints between traceback frames stay part of the section body.
+_FAILURE_LINE_RE = re.compile(
+    r"\n(?:(?P<rule>=[^\n]*)"
+    r"|_{3,} (?P<title>[^_\s][^\n]*?) _{3,}[ \t\r]*(?=\n|\Z)"
+    r"|(?:FAILED|ERROR) (?P<summary>[^\n]*))"
+)
+# Verbose "nodeid FAILED [ 50%]" lines, matched at line starts located with str.find(" FAILED").
+_VERBOSE_FAILED_RE = re.compile(r"(\S+::\S+) FAILED\b")
+
+# Output without any of these cannot contain payloads or failed tests, so parsing is skipped.
+_FAILURE_MARKERS = ("FailurePayload:", "FAILED", "FAILURES", "ERROR", "pytest: error: ")
+
+# Error markers mapped to a bit per error kind; several markers may share a kind.
+_ASSERTION_KIND, _ATTRIBUTE_KIND, _TYPE_KIND, _IMPORT_KIND, _ARGUMENTS_KIND, _FIXTURE_KIND = (1 << n for n in range(6))
+_KIND_MASKS = (
+    ("AssertionError", _ASSERTION_KIND),
+    ("assert ", _ASSERTION_KIND),
+    ("AttributeError", _ATTRIBUTE_KIND),
+    ("TypeError", _TYPE_KIND),
+    ("ImportError", _IMPORT_KIND),
+    ("ModuleNotFoundError", _IMPORT_KIND),
+    ("unrecognized arguments", _ARGUMENTS_KIND),
+)
+_FIXTURE_RE = re.compile("fixture", re.IGNORECASE)
+# One suggestion per kind, in report order.
+_BIT_SUGGESTIONS = (
+    (_ASSERTION_KIND, "Check assertion conditions and expected values against the current behavior"),
+    (_ATTRIBUTE_KIND, "Verify the object exposes the attribute or method the test uses"),
+    (_TYPE_KIND, "Check argument types and the called function's signature"),
+    (_IMPORT_KIND, "Verify import paths and that required dependencies are installed"),
+    (_ARGUMENTS_KIND, "Check the pytest options and that the plugins providing them are installed"),
+    (_FIXTURE_KIND, "Check that the fixture is defined in the test module or a reachable conftest.py"),
+)
+_GENERIC_SUGGESTION = "Review the failure output and recent changes to the code under test"
+
 
 def _fuzzy_selector_replacement(selector: str, dom_snapshot: str) -> str:
     """Very lightweight selector healing from DOM snapshot."""
     if selector in dom_snapshot:
         return selector
 
-    id_candidates = re.findall(r"id=['\"]([^'\"]+)['\"]", dom_snapshot)
-    class_candidates = re.findall(r"class=['\"]([^'\"]+)['\"]", dom_snapshot)
-    if id_candidates:
-        return f"#{id_candidates[0]}"
-    if class_candidates:
-        return "." + class_candidates[0].split()[0]
+    # Only the first match is used, so stop at it; the substring checks skip snapshots without the attribute.
+    id_match = _ID_ATTR_RE.search(dom_snapshot) if "id=" in dom_snapshot else None
+    if id_match:
+        return f"#{id_match.group(1)}"
+    class_match = _CLASS_ATTR_RE.search(dom_snapshot) if "class=" in dom_snapshot else None
+    if class_match:
+        return "." + class_match.group(1).split()[0]
     return selector
 
 
-def _patch_page_objects(repo_path: str, broken_selector: str, healed_selector: str) -> list[str]:
-    patched: list[str] = []
-    pages_dir = Path(repo_path) / "tests" / "pages"
-    if not pages_dir.exists():
+def _iter_page_object_files(directory: str):
+    # scandir avoids a Path per entry; only candidate files are yielded.
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_page_object_files(entry.path)
+            elif entry.name.endswith(_PAGE_OBJECT_SUFFIXES):
+                yield entry.path
+
+
+def _mentions_any(path: str, needles: list[bytes]) -> bool:
+    """Search the file bytes through mmap, so files without a selector are never decoded."""
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return any(mapped.find(needle) != -1 for needle in needles)
+
+
+def _grep_page_object_files(repo_path: str, selectors: list[str]) -> list[str] | None:
+    """List page objects containing any selector via git grep; None when git cannot answer."""
+    # Untracked and gitignored files are searched too, matching the directory walk it replaces.
+    args = [GIT_EXECUTABLE, "-C", repo_path, "grep", "-l", "-z", "-F", "--untracked", "--no-exclude-standard"]
+    for selector in selectors:
+        args.extend(("-e", selector))
+    args.extend(("--", "tests/pages"))
+    try:
+        result = subprocess.run(args, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode == 1:
+        return []
+    if result.returncode != 0:
+        return None
+    return [
+        os.path.join(repo_path, name)
+        for name in result.stdout.split("\0")
+        if name.endswith(_PAGE_OBJECT_SUFFIXES)
+    ]
+
+
+def _patch_page_objects(repo_path: str, replacements: list[tuple[str, str]]) -> list[list[str]]:
+    """Apply every (broken, healed) selector pair; returns the patched files for each pair."""
+    patched: list[list[str]] = [[] for _ in replacements]
+    pages_dir = os.path.join(repo_path, "tests", "pages")
+    if not os.path.isdir(pages_dir):
         return patched
 
-    for page_file in pages_dir.glob("**/*"):
-        if page_file.suffix not in {".py", ".ts", ".tsx", ".js"}:
-            continue
-        content = page_file.read_text(encoding="utf-8", errors="ignore")
-        if broken_selector not in content:
-            continue
-        page_file.write_text(content.replace(broken_selector, healed_selector), encoding="utf-8")
-        patched.append(str(page_file.relative_to(repo_path)))
+    # Let git grep narrow the reads to files that mention a selector; walk everything outside a git repo.
+    candidates = _grep_page_object_files(repo_path, [broken for broken, _ in replacements])
+    if candidates is None:
+        needles = [broken.encode("utf-8") for broken, _ in replacements]
+        candidates = (path for path in _iter_page_object_files(pages_dir) if _mentions_any(path, needles))
+
+    # Read each page object once and apply all replacements in memory, in payload order.
+    for page_path in candidates:
+        page_file = Path(page_path)
+        original = content = page_file.read_text(encoding="utf-8", errors="ignore")
+        for index, (broken_selector, healed_selector) in enumerate(replacements):
+            if broken_selector not in content:
+                continue
+            content = content.replace(broken_selector, healed_selector)
+            patched[index].append(os.path.relpath(page_path, repo_path))
+        if content != original:
+            page_file.write_text(content, encoding="utf-8")
     return patched
 
 
+def _section_lines(text: str, start: int, end: int) -> list[str]:
+    # start lies past end when a header is directly followed by the next boundary.
+    return text[start:end].split("\n") if start <= end else []
+
+
+def _parse_test_failures(pytest_output: str) -> list[dict]:
+    """Collect failed tests from pytest output.
+
+    Reads the ``= FAILURES =`` section, the ``FAILED``/``ERROR`` short summary and verbose
+    ``nodeid FAILED`` lines; section details are matched to node ids by test name. A pytest
+    usage error is reported as a single pseudo-failure.
+    """
+    details: dict[str, list[str]] = {}
+    summaries: list[tuple[str, str]] = []
+    # [start, end) offsets of FAILURES sections, whose body lines are never result lines.
+    failure_spans: list[tuple[int, int]] = []
+    in_failures = False
+    failures_start = 0
+    # Header of the section being read and the offset where its body starts.
+    section_title = None
+    section_start = 0
+
+    # A leading newline lets the first line match like every other one.
+    text = "\n" + pytest_output
+    for match in _FAILURE_LINE_RE.finditer(text):
+        kind = match.lastgroup
+        if in_failures and kind == "summary":
+            continue  # an ordinary body line of the open section
+        if section_title is not None:
+            # The body is the raw text up to the next header or rule, sliced out in one piece.
+            details.setdefault(section_title, []).extend(_section_lines(text, section_start, match.start()))
+            section_title = None
+        if kind == "rule":
+            # Every "=== title ===" rule either opens the FAILURES section or closes it.
+            if in_failures:
+                failure_spans.append((failures_start, match.start()))
+            in_failures = match.group("rule").strip("= \r") == "FAILURES"
+            failures_start = match.end()
+        elif kind == "title":
+            if in_failures:
+                section_title = match.group("title")
+                section_start = match.end() + 1
+        else:
+            test_id, _, message = match.group("summary").rstrip().partition(" - ")
+            summaries.append((test_id.strip(), message))
+    if in_failures:
+        failure_spans.append((failures_start, len(text)))
+    if section_title is not None:
+        # The newline ending the output does not start another line.
+        end = len(text) - 1 if text.endswith("\n") else len(text)
+        details.setdefault(section_title, []).extend(_section_lines(text, section_start, end))
+
+    # Verbose result lines come before the summary, so they are collected first to keep report order.
+    messages: dict[str, str] = {}
+    span_index = 0
+    hit = text.find(" FAILED")
+    while hit != -1:
+        line_start = text.rfind("\n", 0, hit) + 1
+        # Hits arrive in order, so the spans are walked once alongside them.
+        while span_index < len(failure_spans) and failure_spans[span_index][1] <= line_start:
+            span_index += 1
+        if span_index == len(failure_spans) or line_start < failure_spans[span_index][0]:
+            verbose = _VERBOSE_FAILED_RE.match(text, line_start)
+            if verbose:
+                messages.setdefault(verbose.group(1), "")
+        hit = text.find(" FAILED", hit + 7)
+    messages.update(summaries)
+
+    failures: list[dict] = []
+    for test_id, message in messages.items():
+        lines = details.pop(test_id.split("::", 1)[-1].replace("::", "."), None)
+        failures.append({"test": test_id, "lines": lines or ([message] if message else [])})
+    # Sections whose summary line was cut off still deserve suggestions.
+    failures.extend({"test": title, "lines": lines} for title, lines in details.items())
+    if not failures and "pytest: error: " in pytest_output:
+        # pytest rejected its command line (exit code 4) before collecting anything.
+        error = next(line.strip() for line in io.StringIO(pytest_output) if "pytest: error: " in line)
+        failures.append({"test": "pytest command line", "lines": [error]})
+    return failures
+
+
+def _generate_test_repair(failure: dict) -> list[str]:
+    """Suggest fixes for one failed test from well-known error markers in its output."""
+    failure_text = "\n".join(failure.get("lines", []))
+    mask = 0
+    for marker, kind in _KIND_MASKS:
+        if marker in failure_text:
+            mask |= kind
+    # Case-insensitive search without building a lowercased copy of the whole failure text.
+    if _FIXTURE_RE.search(failure_text):
+        mask |= _FIXTURE_KIND
+    # Shared kinds collapse into one bit, so no de-duplication pass is needed.
+    return [suggestion for kind, suggestion in _BIT_SUGGESTIONS if mask & kind] or [_GENERIC_SUGGESTION]
+
+
 async def repair_failing_tests(repo_path: str, test_output: str) -> str:
     """Analyze test failures and apply selector-healing patches when possible."""
     if not repo_path.strip():
@@ -48,29 +246,43 @@ async def repair_failing_tests(repo_path: str, test_output: str) -> str:
     if not test_output.strip():
         return "⚠️ No test output provided. Run execute_tests first to get failure details."
 
-    match = re.search(r"FailurePayload:\n(\[.*?\])\n\n", test_output, re.DOTALL)
-    payloads = []
-    if match:
-        try:
-            payloads = json.loads(match.group(1))
-        except json.JSONDecodeError:
-            payloads = []
-
-    if not payloads:
-        return "✅ No structured failure payloads found - no healing action required."
-
-    logs: list[str] = ["🔧 Self-Healing Report", ""]
-    total_patches = 0
-    for payload in payloads:
-        selector = payload.get("selector", "#unknown")
-        healed_selector = _fuzzy_selector_replacement(selector, payload.get("dom_snapshot", ""))
-        patched_files = _patch_page_objects(repo_path, selector, healed_selector)
-        total_patches += len(patched_files)
-        logs.append(f"- Error: {payload.get('error', 'unknown')}")
-        logs.append(f"  - Broken selector: {selector}")
-        logs.append(f"  - Healed selector: {healed_selector}")
-        logs.append(f"  - Patched files: {', '.join(patched_files) if patched_files else 'none'}")
-
-    logs.append("")
-    logs.append(f"✅ Healing completed with {total_patches} patched selector reference(s).")
-    return "\n".join(logs)
+    no_action = "✅ No structured failure payloads or failed tests found - no healing action required."
+    if not any(marker in test_output for marker in _FAILURE_MARKERS):
+        return no_action
+
+    payloads = parse_failure_payloads(test_output)
+    failures = _parse_test_failures(test_output)
+    if not payloads and not failures:
+        return no_action
+
+    report = io.StringIO()
+    write = report.write
+    if payloads:
+        replacements = [
+            (payload.selector, _fuzzy_selector_replacement(payload.selector, payload.dom_snapshot))
+            for payload in payloads
+        ]
+        # git grep and the page-object reads/writes block, so keep them off the event loop.
+        patched_per_payload = await asyncio.to_thread(_patch_page_objects, repo_path, replacements)
+
+        write("🔧 Self-Healing Report\n\n")
+        total_patches = 0
+        for payload, (selector, healed_selector), patched_files in zip(payloads, replacements, patched_per_payload):
+            total_patches += len(patched_files)
+            write(
+                f"- Error: {payload.error}\n"
+                f"  - Broken selector: {selector}\n"
+                f"  - Healed selector: {healed_selector}\n"
+                f"  - Patched files: {', '.join(patched_files) if patched_files else 'none'}\n"
+            )
+        write(f"\n✅ Healing completed with {total_patches} patched selector reference(s).\n")
+
+    if failures:
+        if payloads:
+            write("\n")
+        write(f"🧪 Failure Analysis ({len(failures)} failed test(s))\n\n")
+        for index, failure in enumerate(failures, 1):
+            write(f"{index}. {failure['test']}\n")
+            for suggestion in _generate_test_repair(failure):
+                write(f"   💡 {suggestion}\n")
+    return report.getvalue()
@@ -9,11 +9,16 @@ import logging
 import subprocess
 from pathlib import Path
 
-from .utils import build_git_clone_url, get_github_token, sanitize_repo_name
+from .utils import GIT_EXECUTABLE, build_git_clone_url, get_github_token, run_quiet_process, sanitize_repo_name
 
 logger = logging.getLogger("qa-council-server.repository-agent")
 
 
+async def _run_git(*args: str, timeout: float) -> tuple[int, str]:
+    """Run git without blocking the event loop; returns (exit code, stderr)."""
+    return await run_quiet_process(GIT_EXECUTABLE, *args, timeout=timeout)
+
+
 async def clone_repository(repo_url: str, branch: str, workspace_dir: Path) -> str:
     """Clone or update a GitHub repository for testing."""
     logger.info("Starting repository sync: repo_url=%s branch=%s", repo_url, branch)
@@ -29,28 +34,29 @@ async def clone_repository(repo_url: str, branch: str, workspace_dir: Path) -> s
         # Pull if the repository already exists locally; otherwise clone fresh.
         if repo_path.exists():
             logger.info("Updating existing repository at %s", repo_path)
-            result = subprocess.run(
-                ["git", "-C", str(repo_path), "pull", "origin", branch],
-                capture_output=True,
-                text=True,
-                timeout=60,
+            # Fetch only the branch tip and move the local branch onto it; a shallow clone has no
+            # history to merge against.
+            returncode, stderr = await _run_git(
+                "-C", str(repo_path), "fetch", "--depth", "1", "origin", branch, timeout=60
             )
-            if result.returncode != 0:
-                logger.error("Git pull failed for %s: %s", repo_path, result.stderr)
-                return f"❌ Repository clone failed: Git pull failed: {result.stderr}"
+            if returncode == 0:
+                returncode, stderr = await _run_git(
+                    "-C", str(repo_path), "checkout", "--force", "-B", branch, "FETCH_HEAD", timeout=60
+                )
+            if returncode != 0:
+                logger.error("Git pull failed for %s: %s", repo_path, stderr)
+                return f"❌ Repository clone failed: Git pull failed: {stderr}"
         else:
             logger.info("Cloning new repository into %s", repo_path)
             github_token = get_github_token()
             git_url = build_git_clone_url(repo_url, github_token)
-            result = subprocess.run(
-                ["git", "clone", "-b", branch, git_url, str(repo_path)],
-                capture_output=True,
-                text=True,
-                timeout=120,
+            # QA only needs the working tree of one branch, not its history.
+            returncode, stderr = await _run_git(
+                "clone", "--depth", "1", "--single-branch", "-b", branch, git_url, str(repo_path), timeout=120
             )
-            if result.returncode != 0:
-                logger.error("Git clone failed for %s: %s", repo_url, result.stderr)
-                return f"❌ Repository clone failed: Git clone failed: {result.stderr}"
+            if returncode != 0:
+                logger.error("Git clone failed for %s: %s", repo_url, stderr)
+                return f"❌ Repository clone failed: Git clone failed: {stderr}"
     except subprocess.TimeoutExpired:
         logger.error("Repository sync timed out for %s", repo_url)
         return "❌ Repository clone failed: Git operation timed out"
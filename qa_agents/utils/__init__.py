@@ -3,21 +3,30 @@
 from .analysis_utils import analyze_python_file
 from .config import get_directory_from_env, get_github_token
 from .git_utils import (
+    GIT_EXECUTABLE,
     build_git_clone_url,
     get_repo_identifier_from_local_repo,
     parse_github_repo_identifier,
+    run_quiet_process,
     sanitize_repo_name,
 )
+from .http_utils import aclose_github_client, get_github_client
+from .json_utils import loads_json
 from .logging_utils import configure_json_logging
 from .path_utils import verify_path_exists
 
 __all__ = [
+    "GIT_EXECUTABLE",
+    "aclose_github_client",
     "analyze_python_file",
     "build_git_clone_url",
     "get_directory_from_env",
+    "get_github_client",
     "get_github_token",
     "get_repo_identifier_from_local_repo",
+    "loads_json",
     "parse_github_repo_identifier",
+    "run_quiet_process",
     "sanitize_repo_name",
     "configure_json_logging",
     "verify_path_exists",
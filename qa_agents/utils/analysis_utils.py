@@ -3,41 +3,150 @@
 from __future__ import annotations
 
 import ast
-from pathlib import Path
+import functools
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from .json_utils import loads_json
+
+# Summaries persist across server runs, keyed by source hash; bump the schema when their shape changes.
+_AST_CACHE_DIR_ENV = "AST_CACHE_DIR"
+_DEFAULT_AST_CACHE_DIR = "/app/cache/ast"
+_AST_CACHE_SCHEMA = 3
+_AST_CACHE_TAG = f"v{_AST_CACHE_SCHEMA}-py{sys.version_info.major}{sys.version_info.minor}"
+# Cache dirs that could not be written (e.g. the /app default outside the container); not retried.
+_unwritable_cache_dirs: set[str] = set()
+
+
+class _ModuleSurfaceCollector(ast.NodeVisitor):
+    """Collect module-level functions, classes and imports without entering def/class bodies.
+
+    Nested defs are not importable from the module, so they must not be reported as functions.
+    Each field is kept as its own parallel list (index i of every fn_* list describes one function).
+    """
+
+    def __init__(self) -> None:
+        self.fn_names: list[str] = []
+        self.fn_args: list[list[str]] = []
+        self.fn_linenos: list[int] = []
+        self.fn_is_async: list[bool] = []
+        self.cls_names: list[str] = []
+        self.cls_methods: list[list[str]] = []
+        self.cls_linenos: list[int] = []
+        self.imports: list[str] = []
+
+    def generic_visit(self, node: ast.AST) -> None:
+        # Only statements (including those under if/try/with) can bind module names; skip expressions.
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.stmt, ast.excepthandler, ast.match_case)):
+                self.visit(child)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        # Bodies are never entered: nested defs are not part of the module surface.
+        self.fn_names.append(node.name)
+        self.fn_args.append([arg.arg for arg in node.args.args])
+        self.fn_linenos.append(node.lineno)
+        self.fn_is_async.append(isinstance(node, ast.AsyncFunctionDef))
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.cls_names.append(node.name)
+        self.cls_methods.append([n.name for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))])
+        self.cls_linenos.append(node.lineno)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        self.imports.extend(alias.name for alias in node.names)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module:
+            self.imports.append(node.module)
 
 
 def analyze_python_file(file_path: str) -> dict:
-    """Analyze Python file structure and extract testable components."""
+    """Analyze Python file structure and extract testable components.
+
+    Functions and classes come back as parallel lists (fn_names/fn_args/fn_linenos/fn_is_async and
+    cls_names/cls_methods/cls_linenos). Results are cached per (path, mtime, size), so agents
+    re-analyzing an unchanged file skip the parse; callers get a shallow copy they may annotate freely.
+    """
     try:
-        content = Path(file_path).read_text(encoding="utf-8")
-        tree = ast.parse(content)
-
-        functions: list[dict] = []
-        classes: list[dict] = []
-        imports: list[str] = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                functions.append(
-                    {
-                        "name": node.name,
-                        "args": [arg.arg for arg in node.args.args],
-                        "lineno": node.lineno,
-                    }
-                )
-            elif isinstance(node, ast.ClassDef):
-                methods = [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
-                classes.append({"name": node.name, "methods": methods, "lineno": node.lineno})
-            elif isinstance(node, ast.Import):
-                imports.extend([alias.name for alias in node.names])
-            elif isinstance(node, ast.ImportFrom) and node.module:
-                imports.append(node.module)
-
-        return {
-            "functions": functions,
-            "classes": classes,
-            "imports": imports,
-            "total_lines": len(content.splitlines()),
+        stat = os.stat(file_path)
+    except OSError:
+        return _analyze_source(file_path)
+    return dict(_analyze_cached(file_path, stat.st_mtime_ns, stat.st_size))
+
+
+@functools.lru_cache(maxsize=4096)
+def _analyze_cached(file_path: str, mtime_ns: int, size: int) -> dict:
+    # mtime/size are part of the key so edits to the file invalidate the entry.
+    return _analyze_source(file_path)
+
+
+def _read_cached_summary(cache_file: str) -> dict | None:
+    try:
+        with open(cache_file, "rb") as handle:
+            return loads_json(handle.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cached_summary(cache_dir: str, cache_file: str, summary: dict) -> None:
+    # Write to a temp file and rename so concurrent readers never see a partial entry.
+    if cache_dir in _unwritable_cache_dirs:
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    except OSError:
+        _unwritable_cache_dirs.add(cache_dir)
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle)
+        os.replace(temp_path, cache_file)
+    except OSError:
+        # Never leave a half-written temp file behind in the cache directory.
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def _analyze_source(file_path: str) -> dict:
+    try:
+        with open(file_path, "rb") as handle:
+            data = handle.read()
+
+        # The grammar depends on the interpreter, so the Python version is part of the key.
+        cache_dir = os.environ.get(_AST_CACHE_DIR_ENV, _DEFAULT_AST_CACHE_DIR)
+        cache_file = os.path.join(cache_dir, f"{hashlib.sha256(data).hexdigest()}-{_AST_CACHE_TAG}.json")
+        cached = _read_cached_summary(cache_file)
+        if cached is not None:
+            return cached
+
+        # Parse the bytes as read: no decoded str copy, and PEP 263 coding cookies are honored.
+        tree = ast.parse(data, filename=file_path)
+
+        collector = _ModuleSurfaceCollector()
+        collector.visit(tree)
+
+        summary = {
+            "fn_names": collector.fn_names,
+            "fn_args": collector.fn_args,
+            "fn_linenos": collector.fn_linenos,
+            "fn_is_async": collector.fn_is_async,
+            "cls_names": collector.cls_names,
+            "cls_methods": collector.cls_methods,
+            "cls_linenos": collector.cls_linenos,
+            "imports": collector.imports,
+            # Count newlines instead of materializing a list of every line.
+            "total_lines": data.count(b"\n") + (bool(data) and not data.endswith(b"\n")),
         }
+        _write_cached_summary(cache_dir, cache_file, summary)
+        return summary
     except Exception as exc:
         return {"error": str(exc)}
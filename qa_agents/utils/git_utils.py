@@ -2,17 +2,53 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import re
+import shutil
+import string
 import subprocess
 from pathlib import Path
 
+# Resolved once so every git subprocess skips the PATH search.
+GIT_EXECUTABLE = shutil.which("git") or "git"
 
+_UNSAFE_NAME_CHARS_RE = re.compile(r"[^a-zA-Z0-9_-]")
+# translate() table with the same effect for ASCII names, which is what repository URLs use.
+_UNSAFE_ASCII_TABLE = {
+    code: "_" for code in range(128) if chr(code) not in string.ascii_letters + string.digits + "_-"
+}
+# owner/repo from HTTPS, SSH (git@github.com:) and token-bearing remotes; trailing whitespace is tolerated.
+_GITHUB_REMOTE_RE = re.compile(r"github\.com[:/]([\w.-]+/[\w.-]+?)(?:\.git)?/?\s*$")
+
+
+async def run_quiet_process(*cmd: str, timeout: float, cwd: str | None = None) -> tuple[int, str]:
+    """Run a command without blocking the event loop; returns (exit code, stderr)."""
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise subprocess.TimeoutExpired(list(cmd), timeout) from None
+    return process.returncode, stderr.decode("utf-8", errors="replace")
+
+
+@functools.lru_cache(maxsize=256)
 def sanitize_repo_name(repo_url: str) -> str:
     """Extract a safe directory name from a repository URL."""
     name = repo_url.rstrip("/").split("/")[-1]
     if name.endswith(".git"):
         name = name[:-4]
-    return re.sub(r"[^a-zA-Z0-9_-]", "_", name)
+    if name.isascii():
+        return name.translate(_UNSAFE_ASCII_TABLE)
+    return _UNSAFE_NAME_CHARS_RE.sub("_", name)
 
 
 def build_git_clone_url(repo_url: str, github_token: str = "") -> str:
@@ -26,27 +62,15 @@ def build_git_clone_url(repo_url: str, github_token: str = "") -> str:
 
 def parse_github_repo_identifier(repo_url: str) -> str:
     """Parse a GitHub URL into owner/repo form."""
-    cleaned = repo_url.strip()
-    if cleaned.startswith("git@github.com:"):
-        cleaned = cleaned.split(":", 1)[1]
-    elif "github.com/" in cleaned:
-        cleaned = cleaned.split("github.com/", 1)[1]
-
-    cleaned = cleaned.rstrip("/")
-    if cleaned.endswith(".git"):
-        cleaned = cleaned[:-4]
-
-    parts = cleaned.split("/")
-    if len(parts) >= 2:
-        return f"{parts[-2]}/{parts[-1]}"
-    return ""
+    match = _GITHUB_REMOTE_RE.search(repo_url)
+    return match.group(1) if match else ""
 
 
 def get_repo_identifier_from_local_repo(repo_path: str | Path) -> str:
     """Read origin remote URL from a local git repository and return owner/repo."""
     try:
         result = subprocess.run(
-            ["git", "-C", str(repo_path), "config", "--get", "remote.origin.url"],
+            [GIT_EXECUTABLE, "-C", str(repo_path), "config", "--get", "remote.origin.url"],
             capture_output=True,
             text=True,
             timeout=10,
@@ -58,4 +82,4 @@ def get_repo_identifier_from_local_repo(repo_path: str | Path) -> str:
     if result.returncode != 0:
         return ""
 
-    return parse_github_repo_identifier(result.stdout.strip())
+    return parse_github_repo_identifier(result.stdout)
@@ -0,0 +1,28 @@
+"""Shared HTTP client for GitHub API calls."""
+
+from __future__ import annotations
+
+import httpx
+
+# One pooled client for every agent, so API calls reuse keep-alive connections and TLS sessions.
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_github_client() -> httpx.AsyncClient:
+    """Return the process-wide GitHub API client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=httpx.Timeout(30.0),
+            headers={"Accept": "application/vnd.github.v3+json"},
+        )
+    return _http_client
+
+
+async def aclose_github_client() -> None:
+    """Close the shared GitHub API client; wired into the server lifespan."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,21 @@
+"""JSON decoding helper that prefers orjson when it is installed."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson  # optional dependency; several times faster on large payloads
+except ModuleNotFoundError:
+    orjson = None
+
+
+def loads_json(data: str | bytes) -> Any:
+    """Decode JSON with orjson when available, falling back to the stdlib parser.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the same error either way.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
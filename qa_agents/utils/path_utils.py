@@ -9,19 +9,10 @@ from pathlib import Path
 def verify_path_exists(path: str) -> tuple[bool, str]:
     """Verify a path exists and is readable."""
     try:
-        p = Path(path)
-        if p.exists():
-            return True, str(p)
-
-        if os.path.exists(path):
-            return True, path
-
-        parent = p.parent
-        if parent.exists():
-            for child in parent.iterdir():
-                if child.name == p.name:
-                    return True, str(child)
-
+        # A single lstat answers for files, directories and links (dangling ones included); a
+        # miss is final, since an entry with exactly this name would have been found by it.
+        if os.path.lexists(path):
+            return True, str(Path(path))
         return False, f"Path not found: {path}"
     except Exception as exc:  # pragma: no cover - defensive guard
         return False, f"Path verification error: {exc}"
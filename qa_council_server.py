@@ -3,9 +3,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import re
 import uuid
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -15,29 +17,47 @@ from qa_agents.analyzer_agent import (
     analyze_codebase as analyzer_agent_analyze_codebase,
 )
 from qa_agents.analyzer_agent import discover_tech_stack_manifest, discover_testable_surfaces, discover_unit_test_targets
-from qa_agents.audit_schema import AuditTrail, FailurePayload
+from qa_agents.audit_schema import AuditTrail
 from qa_agents.cicd_agent import generate_github_workflow as cicd_agent_generate_github_workflow
+from qa_agents.executor_agent import cancel_test_run as executor_agent_cancel_test_run
 from qa_agents.executor_agent import execute_tests as executor_agent_execute_tests
+from qa_agents.executor_agent import parse_failure_payloads
+from qa_agents.executor_agent import poll_test_run as executor_agent_poll_test_run
+from qa_agents.executor_agent import start_test_run as executor_agent_start_test_run
 from qa_agents.generator_agent import generate_e2e_tests as generator_agent_generate_e2e_tests
 from qa_agents.generator_agent import generate_integration_tests as generator_agent_generate_integration_tests
 from qa_agents.generator_agent import generate_unit_tests as generator_agent_generate_unit_tests
 from qa_agents.github_pr_agent import create_test_fix_pr as github_agent_create_test_fix_pr
 from qa_agents.repair_agent import repair_failing_tests as repair_agent_repair_failing_tests
 from qa_agents.repository_agent import clone_repository as repository_agent_clone_repository
-from qa_agents.utils import configure_json_logging, get_directory_from_env
+from qa_agents.utils import aclose_github_client, configure_json_logging, get_directory_from_env
 
 import logging
 
 configure_json_logging()
 logger = logging.getLogger("qa-council-server")
 
-mcp = FastMCP("qa-council")
+
+@asynccontextmanager
+async def _server_lifespan(_server: FastMCP):
+    try:
+        yield {}
+    finally:
+        await aclose_github_client()
+
+
+mcp = FastMCP("qa-council", lifespan=_server_lifespan)
 
 WORKSPACE_DIR = get_directory_from_env("WORKSPACE_DIR", "/app/repos")
 TEST_RESULTS_DIR = get_directory_from_env("TEST_RESULTS_DIR", "/app/test_results")
 COVERAGE_DIR = get_directory_from_env("COVERAGE_DIR", "/app/coverage")
 SESSION_CONTEXT_FILE = WORKSPACE_DIR / "session_context.json"
 
+_GENERATED_ARTIFACT_RE = re.compile(r"(?:📝 Test file|📄 Workflow file):\s*(.+)")
+
+# Unit-test targets generated at once during orchestration.
+_UNIT_TEST_CONCURRENCY = 8
+
 
 @dataclass
 class GeneratedArtifact:
@@ -46,7 +66,7 @@ class GeneratedArtifact:
 
 
 def _extract_generated_artifact(repo_path: str, generator_output: str) -> GeneratedArtifact | None:
-    match = re.search(r"(?:📝 Test file|📄 Workflow file):\s*(.+)", generator_output)
+    match = _GENERATED_ARTIFACT_RE.search(generator_output)
     if not match:
         return None
     generated_path = Path(match.group(1).strip())
@@ -59,6 +79,15 @@ def _extract_generated_artifact(repo_path: str, generator_output: str) -> Genera
     return GeneratedArtifact(relative_path=relative_path, description=f"Generated QA artifact for {relative_path}")
 
 
+async def _stream_block(block: str) -> None:
+    """Send a finished agent block to the client as an MCP log message."""
+    try:
+        await mcp.get_context().info(block)
+    except ValueError:
+        # Called outside an MCP request (e.g. from a script), so there is no session to notify.
+        return
+
+
 def _load_context() -> dict:
     if not SESSION_CONTEXT_FILE.exists():
         return {}
@@ -72,16 +101,6 @@ def _save_context(context: dict) -> None:
     SESSION_CONTEXT_FILE.write_text(json.dumps(context, indent=2), encoding="utf-8")
 
 
-def _extract_failure_payloads(executor_output: str) -> list[FailurePayload]:
-    match = re.search(r"FailurePayload:\n(\[.*?\])\n\n", executor_output, re.DOTALL)
-    if not match:
-        return []
-    try:
-        return [FailurePayload(**payload) for payload in json.loads(match.group(1))]
-    except Exception:
-        return []
-
-
 @mcp.tool()
 async def list_tools() -> str:
     """Expose tool list for inter-agent communication."""
@@ -94,6 +113,9 @@ async def list_tools() -> str:
                 "generate_integration_tests",
                 "generate_e2e_tests",
                 "execute_tests",
+                "start_test_run",
+                "poll_test_run",
+                "cancel_test_run",
                 "repair_failing_tests",
                 "generate_github_workflow",
                 "create_test_fix_pr",
@@ -116,6 +138,9 @@ async def call_tool(tool_name: str, payload: str = "{}") -> str:
         "generate_integration_tests": generate_integration_tests,
         "generate_e2e_tests": generate_e2e_tests,
         "execute_tests": execute_tests,
+        "start_test_run": start_test_run,
+        "poll_test_run": poll_test_run,
+        "cancel_test_run": cancel_test_run,
         "repair_failing_tests": repair_failing_tests,
         "generate_github_workflow": generate_github_workflow,
         "create_test_fix_pr": create_test_fix_pr,
@@ -156,6 +181,21 @@ async def execute_tests(repo_path: str = "", test_path: str = "") -> str:
     return await executor_agent_execute_tests(repo_path, TEST_RESULTS_DIR, COVERAGE_DIR, test_path)
 
 
+@mcp.tool()
+async def start_test_run(repo_path: str = "", test_path: str = "") -> str:
+    return await executor_agent_start_test_run(repo_path, TEST_RESULTS_DIR, COVERAGE_DIR, test_path)
+
+
+@mcp.tool()
+async def poll_test_run(run_id: str = "") -> str:
+    return await executor_agent_poll_test_run(run_id)
+
+
+@mcp.tool()
+async def cancel_test_run(run_id: str = "") -> str:
+    return await executor_agent_cancel_test_run(run_id)
+
+
 @mcp.tool()
 async def repair_failing_tests(repo_path: str = "", test_output: str = "") -> str:
     return await repair_agent_repair_failing_tests(repo_path, test_output)
@@ -193,8 +233,13 @@ async def orchestrate_full_qa_cycle(repo_url: str = "", branch: str = "main", ba
     audit = AuditTrail(session_id=session_id, repo_url=repo_url, branch=branch)
     results: list[str] = []
 
+    async def emit(block: str) -> None:
+        # Clients see each agent's block as soon as it finishes, not only in the final reply.
+        results.append(block)
+        await _stream_block(block)
+
     clone_result = await clone_repository(repo_url=repo_url, branch=branch)
-    results.append(clone_result)
+    await emit(clone_result)
     if "❌" in clone_result:
         return "\n".join(results)
 
@@ -202,51 +247,62 @@ async def orchestrate_full_qa_cycle(repo_url: str = "", branch: str = "main", ba
     audit.repo_path = repo_path
 
     repo = Path(repo_path)
-    manifest = discover_tech_stack_manifest(repo)
+    # The repository scans are independent; run them side by side off the event loop.
+    manifest, surfaces, unit_targets = await asyncio.gather(
+        asyncio.to_thread(discover_tech_stack_manifest, repo),
+        asyncio.to_thread(discover_testable_surfaces, repo),
+        asyncio.to_thread(discover_unit_test_targets, repo),
+    )
     audit.manifest = manifest
-    surfaces = discover_testable_surfaces(repo)
     audit.testable_surfaces = surfaces
 
-    results.append("\nAgent 2 Inspector Manifest:\n" + json.dumps(manifest.__dict__, indent=2))
-    results.append("\nAgent 3 Analyst Surfaces:\n" + json.dumps(surfaces, indent=2))
+    await emit("\nAgent 2 Inspector Manifest:\n" + json.dumps(manifest.__dict__, indent=2))
+    await emit("\nAgent 3 Analyst Surfaces:\n" + json.dumps(surfaces, indent=2))
 
     generated_artifacts: list[GeneratedArtifact] = []
-    for target in discover_unit_test_targets(repo):
-        gen_result = await generate_unit_tests(repo_path=repo_path, target_file=target, manifest_json=json.dumps(manifest.__dict__))
-        results.append(gen_result)
+    manifest_json = json.dumps(manifest.__dict__)
+    unit_slots = asyncio.Semaphore(_UNIT_TEST_CONCURRENCY)
+
+    async def _generate_unit_target(target: str) -> str:
+        async with unit_slots:
+            return await generate_unit_tests(repo_path=repo_path, target_file=target, manifest_json=manifest_json)
+
+    # The generators only write independent files, so the integration and E2E scaffolds run alongside
+    # the unit targets; results keep this order and one failure does not stop the rest.
+    gen_labels = [f"unit tests for {target}" for target in unit_targets]
+    gen_jobs = [_generate_unit_target(target) for target in unit_targets]
+    gen_labels.append("integration tests")
+    gen_jobs.append(generate_integration_tests(repo_path=repo_path, service_name="api", manifest_json=manifest_json))
+    if base_url.strip():
+        gen_labels.append("E2E tests")
+        gen_jobs.append(generate_e2e_tests(repo_path=repo_path, base_url=base_url, test_name="council", manifest_json=manifest_json))
+
+    gen_results = await asyncio.gather(*gen_jobs, return_exceptions=True)
+    for label, gen_result in zip(gen_labels, gen_results):
+        if isinstance(gen_result, Exception):
+            logger.error("Generation of %s failed: %s", label, gen_result)
+            gen_result = f"❌ Error generating {label}: {gen_result}"
+        await emit(gen_result)
         artifact = _extract_generated_artifact(repo_path, gen_result)
         if artifact:
             generated_artifacts.append(artifact)
             audit.generated_artifacts.append({"file": artifact.relative_path, "description": artifact.description})
 
-    integration_result = await generate_integration_tests(repo_path=repo_path, service_name="api", manifest_json=json.dumps(manifest.__dict__))
-    results.append(integration_result)
-    artifact = _extract_generated_artifact(repo_path, integration_result)
-    if artifact:
-        generated_artifacts.append(artifact)
-
-    if base_url.strip():
-        e2e_result = await generate_e2e_tests(repo_path=repo_path, base_url=base_url, test_name="council", manifest_json=json.dumps(manifest.__dict__))
-        results.append(e2e_result)
-        artifact = _extract_generated_artifact(repo_path, e2e_result)
-        if artifact:
-            generated_artifacts.append(artifact)
-
     exec_result = await execute_tests(repo_path=repo_path)
-    results.append(exec_result)
+    await emit(exec_result)
     audit.executor_results = {"raw": exec_result}
-    failures = _extract_failure_payloads(exec_result)
+    failures = parse_failure_payloads(exec_result)
     audit.failure_payloads = failures
 
     if failures:
         heal_result = await repair_failing_tests(repo_path=repo_path, test_output=exec_result)
-        results.append(heal_result)
+        await emit(heal_result)
         audit.repair_logs.append(heal_result)
         verification_result = await execute_tests(repo_path=repo_path)
-        results.append("\nVerification Run:\n" + verification_result)
+        await emit("\nVerification Run:\n" + verification_result)
 
     workflow_result = await generate_github_workflow(repo_path=repo_path, test_command="pytest -v")
-    results.append(workflow_result)
+    await emit(workflow_result)
 
     workflow_artifact = _extract_generated_artifact(repo_path, workflow_result)
     if workflow_artifact:
@@ -270,9 +326,9 @@ async def orchestrate_full_qa_cycle(repo_url: str = "", branch: str = "main", ba
             if artifact_path.exists():
                 fixes.append({"file": artifact.relative_path, "content": artifact_path.read_text(encoding="utf-8"), "description": artifact.description})
         pr_result = await create_test_fix_pr(repo_url=repo_url, test_output=exec_result, fixes=json.dumps(fixes))
-        results.append(pr_result)
+        await emit(pr_result)
 
-    results.append("\nFinal Quality Gate:\n" + json.dumps(quality_gate, indent=2))
+    await emit("\nFinal Quality Gate:\n" + json.dumps(quality_gate, indent=2))
     return "\n".join(results)
 
 
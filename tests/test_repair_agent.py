@@ -0,0 +1,49 @@
+"""Regression checks for the repair agent's pytest output parser."""
+
+from qa_agents.repair_agent import _generate_test_repair, _parse_test_failures
+
+# --tb=long output for one failure whose traceback spans two frames.
+MULTI_FRAME_OUTPUT = """\
+============================= test session starts ==============================
+collected 2 items
+
+test_a.py F.                                                             [100%]
+
+=================================== FAILURES ===================================
+___________________________________ test_one ___________________________________
+
+    def test_one():
+>       helper(1)
+
+test_a.py:5:
+_ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _
+
+x = 1
+
+    def helper(x):
+>       assert x == 2
+E       assert 1 == 2
+
+test_a.py:2: AssertionError
+=========================== short test summary info ============================
+FAILED test_a.py::test_one - assert 1 == 2
+========================= 1 failed, 1 passed in 0.03s ==========================
+"""
+
+
+def test_frame_separator_is_not_a_failure_header():
+    failures = _parse_test_failures(MULTI_FRAME_OUTPUT)
+
+    assert [failure["test"] for failure in failures] == ["test_a.py::test_one"]
+    lines = failures[0]["lines"]
+    assert ">       helper(1)" in lines
+    assert "E       assert 1 == 2" in lines
+    assert "test_a.py:2: AssertionError" in lines
+
+
+def test_multi_frame_failure_gets_assertion_suggestion():
+    (failure,) = _parse_test_failures(MULTI_FRAME_OUTPUT)
+
+    assert _generate_test_repair(failure) == [
+        "Check assertion conditions and expected values against the current behavior"
+    ]